@@ -11,27 +11,250 @@ st.set_page_config(
 
 # Simplified imports - avoid incompatible libraries
 import pdfplumber
+import fitz  # PyMuPDF
 import io
+import os
 import time
 import base64
-import nltk
-from threading import Timer
+import contextlib
+import hashlib
+import re
+import shutil
+import sys
+import tempfile
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Let the Rust tokenizers parallelize batched calls; must be set before they are imported
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
 
 # Use a simplified approach to avoid transformers pipeline issues
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, AutoModelForQuestionAnswering
 
-# Download NLTK punkt package
+# ONNX Runtime is opt-in: set PDF_ASSISTANT_ONNX=1 with optimum[onnxruntime] installed.
+# Its fp32 export bypasses the int8/bf16 optimizations of the torch path, so it is
+# never switched on just because the package happens to be importable
+onnxruntime = None
+if os.environ.get("PDF_ASSISTANT_ONNX") == "1":
+    try:
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTModelForQuestionAnswering
+    except ImportError:
+        onnxruntime = None
+
+# blingfire's native sentence splitter is preferred; a compiled regex covers installs without it
 try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-from nltk.tokenize import sent_tokenize
+    from blingfire import text_to_sentences
+except ImportError:
+    text_to_sentences = None
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Exported ONNX graphs are kept here so the export only happens once per machine
+ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf-assistant", "onnx")
+
+# Processed PDFs (text, token windows, TF-IDF index) each session keeps for re-uploads
+PDF_CACHE_SIZE = 2
+
+# The chunking cache is shared by every session, so bound it for a long-running server:
+# room for PDF_CACHE_SIZE documents across a handful of concurrent sessions, expiring after an hour
+SPLIT_CACHE_MAX_ENTRIES = PDF_CACHE_SIZE * 8
+SPLIT_CACHE_TTL = 3600
+
+# Number of chunks sent through a model in a single forward/generate call
+BATCH_SIZE = 8
+
+# Number of chunks, ranked by TF-IDF similarity to the question, that the QA model reads
+QA_TOP_K = 5
+
+# Token budget for QA inputs: [CLS] question [SEP] context [SEP] fits DistilBERT's 512 positions
+QA_QUESTION_MAX_TOKENS = 32
+QA_CONTEXT_MAX_TOKENS = 512 - QA_QUESTION_MAX_TOKENS - 3
+
+# Tokens shared between consecutive QA windows so answers spanning a boundary survive
+QA_WINDOW_OVERLAP = 64
+
+# Wall-clock budgets (seconds); work stops between batches once they run out
+SUMMARY_TIME_BUDGET = 600
+QA_TIME_BUDGET = 120
+
+# QA batches are smaller so a confident answer can stop the search early
+QA_BATCH_SIZE = 4
+
+# Stop searching once an answer's start*end probability exceeds this
+QA_CONFIDENCE_STOP = 0.9
+
+def split_sentences(text):
+    """Split text into sentences with blingfire, or the regex fallback."""
+    if text_to_sentences is not None:
+        return [s for s in text_to_sentences(text).split("\n") if s]
+    return [s for s in SENTENCE_BOUNDARY.split(text) if s]
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+if DEVICE == "cuda":
+    torch.backends.cuda.matmul.allow_tf32 = True
+
+def _cpu_supports_bf16():
+    """Check the CPU flags for native BF16 instructions (AVX512-BF16 or AMX-BF16)."""
+    # torch 2.0 has no public BF16 capability query, so read the flags from the kernel
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = set(f.read().split())
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+def _select_inference_dtype():
+    """Use float16 on GPUs, bfloat16 on CPUs with native BF16 support, float32 otherwise."""
+    if DEVICE == "cuda":
+        return torch.float16
+    return torch.bfloat16 if _cpu_supports_bf16() else torch.float32
+
+INFERENCE_DTYPE = _select_inference_dtype()
+
+# On a GPU host ONNX Runtime needs the onnxruntime-gpu wheel; with only the CPU wheel
+# the eager torch path runs on CUDA instead
+ONNX_PROVIDER = "CUDAExecutionProvider" if DEVICE == "cuda" else "CPUExecutionProvider"
+USE_ONNX = onnxruntime is not None and ONNX_PROVIDER in onnxruntime.get_available_providers()
+
+def inference_autocast():
+    """Autocast context for model calls; a no-op when running in float32."""
+    if INFERENCE_DTYPE == torch.float32:
+        # torch 2.0 CPU autocast warns about unsupported dtypes even when disabled
+        return contextlib.nullcontext()
+    return torch.autocast(device_type=DEVICE, dtype=INFERENCE_DTYPE)
+
+def _compile_supported():
+    """torch.compile needs torch 2.1+ on Python 3.11 and newer; torch 2.0 only supports up to 3.10."""
+    torch_version = tuple(int(part) for part in torch.__version__.split("+")[0].split(".")[:2])
+    return hasattr(torch, "compile") and (sys.version_info < (3, 11) or torch_version >= (2, 1))
+
+def _compile_model(model, example_inputs):
+    """Compile the model's per-call forward with inductor and warm it up, falling back to eager."""
+    if not _compile_supported():
+        return model
+    # generate() feeds the decoder a KV cache that grows every step, which would
+    # recompile on each new length, so seq2seq models only get their encoder compiled.
+    # Batches are padded to their longest row, so shapes are compiled as dynamic
+    # rather than recompiling (and re-recording CUDA graphs) for every new length
+    target = model.get_encoder() if model.config.is_encoder_decoder else model
+    try:
+        target.forward = torch.compile(target.forward, dynamic=True, fullgraph=False)
+        with torch.inference_mode():
+            if model.config.is_encoder_decoder:
+                model.generate(**example_inputs, max_new_tokens=1)
+            else:
+                model(**example_inputs)
+    except Exception:
+        # Compilation failed on this host - drop the wrapper and keep the eager forward
+        vars(target).pop("forward", None)
+    return model
+
+def _load_ipex():
+    """Import Intel Extension for PyTorch on demand; only the BF16 CPU path pays for it."""
+    try:
+        import intel_extension_for_pytorch as ipex
+    except ImportError:
+        return None
+    return ipex
+
+def _optimize_model(model, example_inputs):
+    """Prepare a freshly loaded model for inference."""
+    model = model.eval()
+    if DEVICE == "cuda":
+        # Inductor can't trace int8 packed weights, so GPU-resident models take
+        # the compile path instead
+        return _compile_model(model, example_inputs)
+    if INFERENCE_DTYPE == torch.float32:
+        # Without BF16 hardware, int8 weights with dynamic activation quantization
+        # cut weight bandwidth 4x and use VNNI int8 dot-products where available
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        ipex = _load_ipex()
+        if ipex is not None:
+            # Prepacks the Linear weights into oneDNN's blocked BF16 layout for its
+            # matmul kernels (eager mode - nothing is traced, frozen or constant-folded)
+            model = ipex.optimize(model, dtype=torch.bfloat16)
+    return model
+
+def _onnx_export_complete(export_dir):
+    """An export is usable only once its config and at least one ONNX graph are on disk."""
+    return (os.path.isfile(os.path.join(export_dir, "config.json"))
+            and any(name.endswith(".onnx") for name in os.listdir(export_dir)))
+
+def _load_onnx_model(ort_class, model_id):
+    """Load an ONNX Runtime model, exporting it to the on-disk cache on first use."""
+    export_dir = os.path.join(ONNX_CACHE_DIR, model_id)
+    if os.path.isdir(export_dir) and _onnx_export_complete(export_dir):
+        return ort_class.from_pretrained(export_dir, provider=ONNX_PROVIDER)
+    
+    model = ort_class.from_pretrained(model_id, export=True, provider=ONNX_PROVIDER)
+    # Write into a scratch directory and rename it into place once complete, so an
+    # interrupted export is never mistaken for a valid cache on the next start
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{model_id}-", dir=ONNX_CACHE_DIR)
+    try:
+        model.save_pretrained(tmp_dir)
+        shutil.rmtree(export_dir, ignore_errors=True)
+        os.replace(tmp_dir, export_dir)
+    except OSError:
+        # Another process finished the same export first - keep theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return model
+
+@st.cache_resource(show_spinner=False)
+def get_summarizer():
+    """Load the T5-small summarizer once per process and share it across sessions."""
+    tokenizer = AutoTokenizer.from_pretrained("t5-small", use_fast=True)
+    if USE_ONNX:
+        model = _load_onnx_model(ORTModelForSeq2SeqLM, "t5-small")
+    else:
+        model = _optimize_model(
+            AutoModelForSeq2SeqLM.from_pretrained("t5-small", torch_dtype=INFERENCE_DTYPE).to(DEVICE),
+            tokenizer(["summarize: warm up"], return_tensors="pt").to(DEVICE),
+        )
+    return tokenizer, model
+
+@st.cache_resource(show_spinner=False)
+def get_qa_tokenizer():
+    """Load the DistilBERT tokenizer on its own, so PDFs can be chunked before the model is needed."""
+    return AutoTokenizer.from_pretrained("distilbert-base-cased-distilled-squad", use_fast=True)
+
+@st.cache_resource(show_spinner=False)
+def get_qa():
+    """Load the DistilBERT QA model once per process and share it across sessions."""
+    tokenizer = get_qa_tokenizer()
+    if USE_ONNX:
+        model = _load_onnx_model(ORTModelForQuestionAnswering, "distilbert-base-cased-distilled-squad")
+    else:
+        model = _optimize_model(
+            AutoModelForQuestionAnswering.from_pretrained(
+                "distilbert-base-cased-distilled-squad", torch_dtype=INFERENCE_DTYPE
+            ).to(DEVICE),
+            tokenizer(["warm up"], ["warm up"], return_tensors="pt").to(DEVICE),
+        )
+    return tokenizer, model
 
-class TimeoutException(Exception):
-    pass
+def _extract_pages_pymupdf(pdf_bytes, on_page):
+    """Extract the text of every page with the native MuPDF parser."""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        total_pages = len(doc)
+        pages = []
+        for page_num, page in enumerate(doc):
+            pages.append(page.get_text("text"))
+            on_page(page_num + 1, total_pages)
+        return pages
 
-def timeout_handler():
-    raise TimeoutException("Operation timed out")
+def _extract_pages_pdfplumber(pdf_bytes, on_page):
+    """Extract the text of every page with pdfplumber."""
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        total_pages = len(pdf.pages)
+        pages = []
+        for page_num, page in enumerate(pdf.pages):
+            pages.append(page.extract_text() or "")
+            on_page(page_num + 1, total_pages)
+        return pages
 
 class PDFAssistant:
     def __init__(self):
@@ -51,6 +274,12 @@ class PDFAssistant:
         
         self.pdf_text = ""
         self.summary = ""
+        self.qa_chunks = []
+        self._qa_chunk_ids = []
+        self._vectorizer = None
+        self._chunk_mat = None
+        # Most recently processed PDFs keyed by content hash, at most PDF_CACHE_SIZE of them
+        self._pdf_cache = {}
     
     def _load_models(self):
         """Load AI models when needed"""
@@ -59,12 +288,10 @@ class PDFAssistant:
                 # Load smaller, faster models for Streamlit compatibility
                 with st.spinner("Loading AI models (first use)..."):
                     # For summarization - use T5-small instead of BART (more compatible)
-                    self.summarizer_tokenizer = AutoTokenizer.from_pretrained("t5-small")
-                    self.summarizer_model = AutoModelForSeq2SeqLM.from_pretrained("t5-small")
+                    self.summarizer_tokenizer, self.summarizer_model = get_summarizer()
                     
                     # For QA - use a smaller model
-                    self.qa_tokenizer = AutoTokenizer.from_pretrained("distilbert-base-cased-distilled-squad")
-                    self.qa_model = AutoModelForQuestionAnswering.from_pretrained("distilbert-base-cased-distilled-squad")
+                    self.qa_tokenizer, self.qa_model = get_qa()
                 
                 self.models_loaded = True
             except Exception as e:
@@ -72,51 +299,89 @@ class PDFAssistant:
                 return False
         return True
         
+    def _to_device(self, encoded):
+        """Copy tokenized inputs to the model device, leaving the CPU encoding for decoding."""
+        return {k: v.to(DEVICE) for k, v in encoded.items()}
+    
     def read_pdf(self, pdf_file):
-        """Extract text from a PDF file using pdfplumber."""
+        """Extract text from a PDF file using PyMuPDF, falling back to pdfplumber."""
         try:
             pdf_bytes = pdf_file.read()
             pdf_file.seek(0)  # Reset file pointer after reading
             
-            self.pdf_text = ""
-            
-            # Use pdfplumber to read the PDF
-            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-                total_pages = len(pdf.pages)
-                progress_bar = st.progress(0)
-                
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text() or ""
-                    self.pdf_text += page_text + "\n"
-                    progress_bar.progress((page_num + 1) / total_pages)
+            # Re-uploading the same file skips extraction, chunking and indexing entirely
+            key = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+            if key in self._pdf_cache:
+                # Move the hit to the end so the least recently used PDF is evicted first
+                self._pdf_cache[key] = self._pdf_cache.pop(key)
+            else:
+                self._pdf_cache[key] = self._process_pdf(pdf_bytes)
+                while len(self._pdf_cache) > PDF_CACHE_SIZE:
+                    self._pdf_cache.pop(next(iter(self._pdf_cache)))
+            (self.pdf_text, total_pages, self.qa_chunks, self._qa_chunk_ids,
+             self._vectorizer, self._chunk_mat) = self._pdf_cache[key]
             
             return f"PDF loaded successfully. Contains {len(self.pdf_text)} characters and {total_pages} pages."
         except Exception as e:
             return f"Error reading PDF: {str(e)}"
     
-    def _summarize_text(self, text):
-        """Summarize a chunk of text using the model."""
+    def _process_pdf(self, pdf_bytes):
+        """Extract, chunk and index a PDF, returning everything read_pdf caches for it."""
+        progress_bar = st.progress(0)
+        
+        def on_page(done, total):
+            # Every update is a websocket roundtrip, so cap them at ~100 per document
+            if done % max(1, total // 100) == 0 or done == total:
+                progress_bar.progress(done / total)
+        
+        try:
+            pages = _extract_pages_pymupdf(pdf_bytes, on_page)
+        except Exception:
+            # MuPDF rejected the file - retry with the slower pure-Python parser
+            pages = _extract_pages_pdfplumber(pdf_bytes, on_page)
+        pdf_text = "".join(page_text + "\n" for page_text in pages)
+        
+        # Chunk once per PDF into windows that fill the QA model's context, and index
+        # their text so questions only reach relevant ones
+        qa_tokenizer = get_qa_tokenizer()
+        qa_chunk_ids = self._split_tokens(qa_tokenizer, pdf_text)
+        qa_chunks = qa_tokenizer.batch_decode(qa_chunk_ids)
+        try:
+            vectorizer = TfidfVectorizer(stop_words="english")
+            chunk_mat = vectorizer.fit_transform(qa_chunks)
+        except ValueError:
+            # Empty vocabulary (no extractable words) - questions scan every chunk instead
+            vectorizer = None
+            chunk_mat = None
+        
+        return pdf_text, len(pages), qa_chunks, qa_chunk_ids, vectorizer, chunk_mat
+    
+    def _summarize_text(self, texts, num_beams=1):
+        """Summarize a batch of text chunks using the model."""
         if not self._load_models():
-            return "Failed to load AI models."
+            return ["Failed to load AI models."]
             
-        # Prepare the input for T5 (expects "summarize: " prefix)
-        inputs = self.summarizer_tokenizer("summarize: " + text, return_tensors="pt", max_length=512, truncation=True)
+        # Prepare the input for T5 (expects "summarize: " prefix). Chunks are ~500 characters,
+        # roughly 125 tokens, so a 160-token cap leaves headroom without 512-wide attention
+        encoded = self.summarizer_tokenizer(["summarize: " + text for text in texts], return_tensors="pt",
+                                            padding=True, truncation=True, max_length=160)
+        inputs = self._to_device(encoded)
         
-        # Generate summary
-        summary_ids = self.summarizer_model.generate(
-            inputs.input_ids, 
-            max_length=100, 
-            min_length=30,
-            length_penalty=2.0,
-            num_beams=4,
-            early_stopping=True
-        )
+        # Generate summaries for the whole batch in one call
+        with torch.inference_mode(), inference_autocast():
+            summary_ids = self.summarizer_model.generate(
+                **inputs,
+                max_new_tokens=100,
+                min_new_tokens=30,
+                num_beams=num_beams,
+                do_sample=False,
+                use_cache=True
+            )
         
-        # Decode the summary
-        summary = self.summarizer_tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-        return summary
+        # Decode the summaries
+        return self.summarizer_tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
     
-    def generate_summary(self):
+    def generate_summary(self, num_beams=1):
         """Generate a summary of the PDF content."""
         if not self.pdf_text:
             return "Please load a PDF first."
@@ -128,37 +393,32 @@ class PDFAssistant:
             if not chunks:
                 return "Unable to extract meaningful text from the PDF."
             
+            # Skip very short chunks
+            texts = [chunk for chunk in chunks if len(chunk) >= 100]
             summaries = []
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            for i, chunk in enumerate(chunks):
-                progress_value = (i + 1) / len(chunks)
-                progress_bar.progress(progress_value)
-                status_text.text(f"Processing chunk {i+1}/{len(chunks)}...")
+            # Throttle UI updates to ~100 regardless of document length
+            step = max(1, len(texts) // BATCH_SIZE // 100)
+            deadline = time.monotonic() + SUMMARY_TIME_BUDGET
+            
+            for batch_num, start in enumerate(range(0, len(texts), BATCH_SIZE)):
+                if time.monotonic() > deadline:
+                    st.warning(f"Time limit reached. Summary covers the first {start} of {len(texts)} chunks.")
+                    break
                 
-                if len(chunk) < 100:  # Skip very short chunks
-                    continue
+                batch = texts[start:start + BATCH_SIZE]
+                end = start + len(batch)
+                if batch_num % step == 0 or end == len(texts):
+                    progress_bar.progress(end / len(texts))
+                    status_text.text(f"Processing chunks {start+1}-{end}/{len(texts)}...")
                     
-                # Generate summary for this chunk with timeout
+                # Generate summaries for this batch
                 try:
-                    timeout_flag = False
-                    timer = Timer(60, timeout_handler)  # 60 second timeout
-                    timer.start()
-                    try:
-                        chunk_summary = self._summarize_text(chunk)
-                        summaries.append(chunk_summary)
-                    except TimeoutException:
-                        timeout_flag = True
-                        st.warning(f"Chunk {i+1} took too long to summarize. Skipping.")
-                    finally:
-                        timer.cancel()
-                    
-                    if timeout_flag:
-                        continue
-                        
+                    summaries.extend(self._summarize_text(batch, num_beams=num_beams))
                 except Exception as e:
-                    st.error(f"Error summarizing chunk {i+1}: {str(e)}")
+                    st.error(f"Error summarizing chunks {start+1}-{end}: {str(e)}")
             
             # Combine the summaries
             if not summaries:
@@ -171,30 +431,59 @@ class PDFAssistant:
             st.error(f"Error in summary generation: {str(e)}")
             return "An error occurred while generating the summary."
     
-    def _answer_question_from_context(self, question, context):
-        """Answer a question based on the given context."""
+    def _answer_question_from_context(self, question, chunk_indices):
+        """Answer a question against a batch of QA chunks, returning (answer, confidence) per chunk."""
         if not self._load_models():
-            return "Failed to load AI models.", 0
+            return [("Failed to load AI models.", 0)]
 
-        # Tokenize the input
-        inputs = self.qa_tokenizer(question, context, return_tensors="pt", 
-                                  truncation=True, max_length=512,
-                                  padding="max_length")
+        # Only the question is tokenized per call; it is joined to the cached chunk ids
+        # as [CLS] question [SEP] context [SEP] and padded to the longest row
+        question_ids = self.qa_tokenizer(question, add_special_tokens=False, truncation=True,
+                                         max_length=QA_QUESTION_MAX_TOKENS)["input_ids"]
+        rows = [self.qa_tokenizer.build_inputs_with_special_tokens(question_ids, self._qa_chunk_ids[i])
+                for i in chunk_indices]
+        encoded = self.qa_tokenizer.pad({"input_ids": rows}, return_tensors="pt")
+        inputs = self._to_device(encoded)
         
-        # Get the answer
-        with torch.no_grad():
+        # Get the answers
+        with torch.inference_mode(), inference_autocast():
             outputs = self.qa_model(**inputs)
-            answer_start = torch.argmax(outputs.start_logits)
-            answer_end = torch.argmax(outputs.end_logits) + 1
-            answer = self.qa_tokenizer.convert_tokens_to_string(
-                self.qa_tokenizer.convert_ids_to_tokens(inputs.input_ids[0][answer_start:answer_end])
-            )
+            # Padding positions must not take probability mass from the real tokens
+            padding = inputs["attention_mask"] == 0
+            start_logits = outputs.start_logits.float().masked_fill(padding, float("-inf"))
+            end_logits = outputs.end_logits.float().masked_fill(padding, float("-inf"))
+            start_max, answer_starts = start_logits.max(dim=-1)
+            end_max, answer_ends = end_logits.max(dim=-1)
+            # Confidence is the probability of the chosen start times that of the chosen end.
+            # max(softmax(x)) == exp(max(x) - logsumexp(x)), so no softmax is materialized
+            confidences = torch.exp(
+                start_max + end_max - start_logits.logsumexp(dim=-1) - end_logits.logsumexp(dim=-1)
+            ).tolist()
         
-        # Calculate confidence score (simplified)
-        confidence = float(torch.max(outputs.start_logits).item() + torch.max(outputs.end_logits).item()) / 2
-        normalized_conf = min(1.0, max(0.0, confidence / 10.0))  # Normalize to 0-1
+        results = []
+        for row, (answer_start, answer_end) in enumerate(zip(answer_starts.tolist(), answer_ends.tolist())):
+            answer = self.qa_tokenizer.decode(encoded.input_ids[row, answer_start:answer_end + 1],
+                                              skip_special_tokens=True)
+            results.append((answer, confidences[row]))
         
-        return answer, normalized_conf
+        return results
+    
+    def _retrieve_chunks(self, question, top_k=QA_TOP_K):
+        """Return indices of the top_k chunks most similar to the question, best match first."""
+        all_chunks = list(range(len(self.qa_chunks)))
+        if self._vectorizer is None:
+            return all_chunks
+        
+        # Rows of the TF-IDF matrix are L2-normalized, so the dot product is the cosine similarity
+        question_vec = self._vectorizer.transform([question])
+        scores = (self._chunk_mat @ question_vec.T).toarray().ravel()
+        if not scores.any():
+            # No vocabulary overlap with the question - fall back to every chunk
+            return all_chunks
+        
+        top = np.argpartition(-scores, top_k)[:top_k] if len(scores) > top_k else np.arange(len(scores))
+        # argpartition leaves the top_k unordered; rank them so early stopping keeps the best
+        return top[np.argsort(-scores[top])].tolist()
     
     def answer_question(self, question):
         """Answer a question based on the PDF content."""
@@ -205,11 +494,8 @@ class PDFAssistant:
             return "Please enter a valid question."
         
         try:
-            # Add torch import here to avoid issues with module not available at top level
-            import torch
-            
             # For long documents, find the most relevant sections
-            chunks = self._split_text(self.pdf_text, max_length=1000, overlap=100)
+            chunks = self._retrieve_chunks(question)
             
             if not chunks:
                 return "Unable to extract meaningful text from the PDF to answer questions."
@@ -220,32 +506,33 @@ class PDFAssistant:
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            for i, chunk in enumerate(chunks):
-                progress_value = (i + 1) / len(chunks)
-                progress_bar.progress(progress_value)
-                status_text.text(f"Searching chunk {i+1}/{len(chunks)}...")
+            # Throttle UI updates to ~100 regardless of document length
+            step = max(1, len(chunks) // QA_BATCH_SIZE // 100)
+            deadline = time.monotonic() + QA_TIME_BUDGET
+            
+            for batch_num, start in enumerate(range(0, len(chunks), QA_BATCH_SIZE)):
+                if time.monotonic() > deadline:
+                    st.warning(f"Time limit reached. Searched {start} of {len(chunks)} chunks.")
+                    break
+                
+                batch = chunks[start:start + QA_BATCH_SIZE]
+                end = start + len(batch)
+                if batch_num % step == 0 or end == len(chunks):
+                    progress_bar.progress(end / len(chunks))
+                    status_text.text(f"Searching chunks {start+1}-{end}/{len(chunks)}...")
                 
                 try:
-                    timeout_flag = False
-                    timer = Timer(30, timeout_handler)  # 30 second timeout per chunk
-                    timer.start()
-                    try:
-                        answer, score = self._answer_question_from_context(question, chunk)
-                        
+                    for answer, score in self._answer_question_from_context(question, batch):
                         if score > highest_score and len(answer.strip()) > 0:
                             highest_score = score
                             best_answer = answer
-                    except TimeoutException:
-                        timeout_flag = True
-                        st.warning(f"Chunk {i+1} took too long to process. Skipping.")
-                    finally:
-                        timer.cancel()
                     
-                    if timeout_flag:
-                        continue
+                    if highest_score > QA_CONFIDENCE_STOP:
+                        # Confident enough - skip the remaining chunks
+                        break
                         
                 except Exception as e:
-                    st.error(f"Error processing chunk {i+1}: {str(e)}")
+                    st.error(f"Error processing chunks {start+1}-{end}: {str(e)}")
             
             progress_bar.empty()
             status_text.empty()
@@ -258,35 +545,60 @@ class PDFAssistant:
             st.error(f"Error in question answering: {str(e)}")
             return "An error occurred while processing your question."
     
-    def _split_text(self, text, max_length=1000, overlap=100):
+    @staticmethod
+    def _split_tokens(tokenizer, text, window=QA_CONTEXT_MAX_TOKENS, overlap=QA_WINDOW_OVERLAP):
+        """Split text into overlapping windows of token ids that each fill the QA model's context."""
+        if not text or text.isspace():
+            return []
+        
+        ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+        if not ids:
+            return []
+        # Stop once a window reaches the end, so the tail isn't repeated in a tiny extra window
+        step = window - overlap
+        return [ids[start:start + window] for start in range(0, max(len(ids) - overlap, 1), step)]
+    
+    @staticmethod
+    @st.cache_data(show_spinner=False, max_entries=SPLIT_CACHE_MAX_ENTRIES, ttl=SPLIT_CACHE_TTL)
+    def _split_text(text, max_length=1000, overlap=100):
         """Split text into overlapping chunks of approximately max_length characters."""
         if not text or text.isspace():
             return []
             
         # First split by sentences to avoid cutting in the middle of a sentence
         try:
-            sentences = sent_tokenize(text)
+            sentences = split_sentences(text)
         except Exception as e:
             st.error(f"Error tokenizing text: {str(e)}")
             # Fallback to simple splitting if tokenization fails
             sentences = [s + "." for s in text.split(".") if s]
         
         chunks = []
-        current_chunk = ""
+        buf = []  # Sentences of the chunk being built
+        buf_len = 0  # Characters in buf, counting one separating space per sentence
         
         for sentence in sentences:
-            if len(current_chunk) + len(sentence) <= max_length:
-                current_chunk += " " + sentence
-            else:
-                if current_chunk.strip():  # Only add non-empty chunks
-                    chunks.append(current_chunk.strip())
-                # Start a new chunk with overlap from the previous chunk
-                overlap_point = max(0, len(current_chunk) - overlap)
-                current_chunk = current_chunk[overlap_point:] + " " + sentence
+            if buf_len + len(sentence) <= max_length:
+                buf.append(sentence)
+                buf_len += len(sentence) + 1
+                continue
+            
+            chunk = " ".join(buf).strip()
+            if chunk:  # Only add non-empty chunks
+                chunks.append(chunk)
+            # Start a new chunk seeded with the trailing sentences covering the overlap
+            seed_count = 0
+            seed_len = 0
+            while seed_len < overlap and seed_count < len(buf) - 1:
+                seed_count += 1
+                seed_len += len(buf[-seed_count]) + 1
+            buf = buf[len(buf) - seed_count:] + [sentence]
+            buf_len = seed_len + len(sentence) + 1
         
         # Add the last chunk if it's not empty
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        chunk = " ".join(buf).strip()
+        if chunk:
+            chunks.append(chunk)
             
         return chunks
 
@@ -365,6 +677,14 @@ def main():
                     st.session_state.file_processed = True
                     st.success(result)
         
+        summary_beams = st.slider(
+            "Summary beams",
+            min_value=1,
+            max_value=4,
+            value=1,
+            help="1 is fastest (greedy decoding); more beams can improve quality but scale decoding time",
+        )
+        
         st.markdown('<div class="status-info">', unsafe_allow_html=True)
         st.markdown("**App Status**")
         if 'file_processed' in st.session_state and st.session_state.file_processed:
@@ -390,8 +710,8 @@ def main():
         - Hugging Face Transformers
         - T5 for summarization
         - DistilBERT for question answering
-        - NLTK for text processing
-        - pdfplumber for PDF extraction
+        - blingfire for sentence splitting
+        - PyMuPDF and pdfplumber for PDF extraction
         """)
         
         st.divider()
@@ -410,7 +730,7 @@ def main():
         if 'file_processed' in st.session_state and st.session_state.file_processed:
             if st.button("Generate Summary"):
                 with st.spinner("Generating summary... This may take a few minutes."):
-                    summary = st.session_state.assistant.generate_summary()
+                    summary = st.session_state.assistant.generate_summary(num_beams=summary_beams)
                     st.session_state.summary = summary
             
             if 'summary' in st.session_state and st.session_state.summary: